@@ -2,16 +2,63 @@
 
 from __future__ import annotations
 
-import html
+import re
+import sys
+from collections.abc import Sequence
 from contextvars import ContextVar, Token
 from pathlib import Path
 from types import TracebackType
+from typing import Protocol, Self
 
 # Context variable to track the current parent element in a `with` block
 _current_parent: ContextVar[Element | None] = ContextVar(
     "_current_parent", default=None
 )
 
+# Memoised Python keyword -> HTML attribute name mappings
+_ATTR_NAME_CACHE: dict[str, str] = {}
+
+# Single-pass escape tables.  Text content only needs ``&``, ``<`` and ``>``
+# escaped; attribute values are always double-quoted and also escape quotes.
+_ESCAPE_TABLE_NOQUOTE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_ESCAPE_TABLE = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+)
+_UNSAFE_TEXT_CHARS = re.compile(r"[&<>]")
+_UNSAFE_ATTR_CHARS = re.compile(r"[&<>\"']")
+
+
+def _escape_text(value: str) -> str:
+    """Escape *value* for use as text content, in a single pass.
+
+    Clean strings (the common case) are detected with one C-level regex scan
+    and returned unchanged.
+    """
+    if _UNSAFE_TEXT_CHARS.search(value) is None:
+        return value
+    return value.translate(_ESCAPE_TABLE_NOQUOTE)
+
+
+def _escape_attr(value: str) -> str:
+    """Escape *value* for use inside a double-quoted attribute, in a single pass."""
+    if _UNSAFE_ATTR_CHARS.search(value) is None:
+        return value
+    return value.translate(_ESCAPE_TABLE)
+
+
+class _Node(Protocol):
+    """Anything besides text that the serializer can schedule on its stack.
+
+    ``Element`` and ``Trusted`` implement this protocol; text children are
+    plain strings.  It only describes the contract for the type checker: the
+    serializer tells nodes apart from text with ``isinstance`` checks against
+    the two concrete classes.
+    """
+
+    def _open(self, out: list[str], stack: list[_Node | str]) -> None:
+        """Emit this node's output to *out*, scheduling any contents on *stack*."""
+        ...
+
 
 class Element:
     """Base class for all HTML elements.
@@ -26,13 +73,48 @@ class Element:
       (e.g. ``data_id="5"`` renders as ``data-id="5"``).
     - A boolean ``True`` value renders the attribute as a bare/boolean attribute.
     - ``False`` and ``None`` values cause the attribute to be omitted.
+
+    The start tag, including its attributes, is serialised once at
+    construction time.  ``attributes`` is kept for introspection, but mutating
+    it afterwards does not change the rendered output.
     """
 
+    __slots__ = (
+        "children",
+        "attributes",
+        "_start_tag",
+        "_frozen",
+        "_cache",
+        "_parent_token",
+    )
+
     tag: str = ""
     self_closing: bool = False
     raw_text: bool = False
     _parent_token: Token[Element | None]
 
+    # Interned tag fragments, precomputed per subclass in ``__init_subclass__``
+    _open_prefix: str = "<"
+    _open_suffix: str = ">"
+    _open_bare: str = "<>"
+    _close_tag: str = "</>"
+
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._open_prefix = sys.intern("<" + cls.tag)
+        cls._open_suffix = " />" if cls.self_closing else ">"
+        cls._open_bare = sys.intern(cls._open_prefix + cls._open_suffix)
+        cls._close_tag = sys.intern("</" + cls.tag + ">")
+        if "_open" not in cls.__dict__:
+            # Pick the implementation that matches the class flags, also when
+            # they are only set on a class instead of using the base classes
+            if cls.self_closing:
+                cls._open = _VoidElement._open  # pyright: ignore
+            elif cls.raw_text:
+                cls._open = _RawTextElement._open  # pyright: ignore
+            else:
+                cls._open = Element._open
+
     def __init__(
         self, *children: Element | Trusted | str, **attributes: str | bool | None
     ) -> None:
@@ -40,13 +122,43 @@ class Element:
             raise ValueError(
                 f"<{self.tag}> is a self-closing (void) element and cannot have children."
             )
-        self.children: list[Element | Trusted | str] = list(children)
+        # Kept as the incoming tuple; only promoted to a list if something is
+        # appended to it via a `with` block (see ``_mutable_children``)
+        self.children: Sequence[Element | Trusted | str] = children
         self.attributes = attributes
+        if attributes:
+            self._start_tag = (
+                self._open_prefix + self._serialize_attributes() + self._open_suffix
+            )
+        else:
+            self._start_tag = self._open_bare
+        self._frozen = False
+        self._cache: str | None = None
 
         # If created inside a `with` block, append self to the parent
         parent = _current_parent.get()
         if parent is not None:
-            parent.children.append(self)
+            parent._mutable_children().append(self)
+
+    def _mutable_children(self) -> list[Element | Trusted | str]:
+        """Return ``children`` as a list, converting it on first mutation."""
+        children = self.children
+        if not isinstance(children, list):
+            children = self.children = list(children)
+        self._cache = None
+        return children
+
+    def append(self, *children: Element | Trusted | str) -> None:
+        """Append *children* to this element after construction.
+
+        ``children`` may be a tuple, so use this instead of
+        ``element.children.append(...)``.
+        """
+        if self.self_closing and children:
+            raise ValueError(
+                f"<{self.tag}> is a self-closing (void) element and cannot have children."
+            )
+        self._mutable_children().extend(children)
 
     # ------------------------------------------------------------------
     # Context manager support
@@ -58,6 +170,7 @@ class Element:
             raise ValueError(
                 f"<{self.tag}> is a self-closing (void) element and cannot have children."
             )
+        self._mutable_children()
         self._parent_token = _current_parent.set(self)
         return self
 
@@ -77,11 +190,14 @@ class Element:
     @staticmethod
     def _normalise_attr_name(name: str) -> str:
         """Convert a Python-friendly attribute name to its HTML equivalent."""
-        # Strip trailing underscore (allows class_, for_, etc.)
-        if name.endswith("_"):
-            name = name[:-1]
-        # Convert interior underscores to hyphens
-        return name.replace("_", "-")
+        html_name = _ATTR_NAME_CACHE.get(name)
+        if html_name is None:
+            # Strip trailing underscore (allows class_, for_, etc.) and convert
+            # interior underscores to hyphens
+            html_name = name[:-1] if name.endswith("_") else name
+            html_name = html_name.replace("_", "-")
+            html_name = _ATTR_NAME_CACHE[name] = sys.intern(html_name)
+        return html_name
 
     def _serialize_attributes(self) -> str:
         parts: list[str] = []
@@ -90,46 +206,129 @@ class Element:
                 continue
             attr_name = self._normalise_attr_name(key)
             if value is True:
-                parts.append(attr_name)
+                parts.append(" " + attr_name)
+            else:
+                parts.append(f' {attr_name}="{_escape_attr(str(value))}"')
+        return "".join(parts)
+
+    def _open(self, out: list[str], stack: list[_Node | str]) -> None:
+        """Emit this element's opening tag and schedule its contents on *stack*.
+
+        This is the implementation for normal elements.  Void and raw-text
+        classes get the ``_open`` of ``_VoidElement`` and ``_RawTextElement``
+        instead.
+        """
+        if self._frozen:
+            out.append(self._frozen_output())
+            return
+        out.append(self._start_tag)
+        stack.append(self._close_tag)
+        for child in reversed(self.children):
+            if type(child) is str:
+                stack.append(_escape_text(child))
+            elif isinstance(child, (Element, Trusted)):
+                stack.append(child)
             else:
-                escaped = html.escape(str(value), quote=True)
-                parts.append(f'{attr_name}="{escaped}"')
-        if not parts:
-            return ""
-        return " " + " ".join(parts)
-
-    def _serialize_children(self) -> str:
-        pieces: list[str] = []
-        for child in self.children:
-            if isinstance(child, (Element, Trusted)):
-                pieces.append(child._serialize())  # pyright: ignore
+                stack.append(_escape_text(str(child)))
+
+    def _frozen_output(self) -> str:
+        """Return the cached HTML of this frozen element, rendering it if needed."""
+        cache = self._cache
+        if cache is None:
+            # Render once as a normal element, then keep the result
+            self._frozen = False
+            try:
+                cache = self._cache = self._serialize()
+            finally:
+                self._frozen = True
+        return cache
+
+    def _write(self, out: list[str]) -> None:
+        """Append the HTML fragments for this element and its descendants to *out*.
+
+        The tree is walked with an explicit stack rather than recursion, so
+        arbitrarily deep documents do not hit Python's recursion limit.  The
+        stack holds either nodes still to be opened or ready-made string
+        fragments (escaped text and pending close tags).
+        """
+        stack: list[_Node | str] = [self]
+        while stack:
+            node = stack.pop()
+            # Not ``type(node) is str``: the fallback branches of ``_open`` can
+            # push str subclasses whose ``__str__`` returns themselves
+            if isinstance(node, str):
+                out.append(node)
             else:
-                if self.raw_text:
-                    pieces.append(str(child))
-                else:
-                    pieces.append(html.escape(str(child)))
-        return "".join(pieces)
+                node._open(out, stack)  # pyright: ignore
 
     def _serialize(self) -> str:
         """Return the HTML string for this element and all its descendants."""
-        attrs = self._serialize_attributes()
-        if self.self_closing:
-            return f"<{self.tag}{attrs} />"
-        inner = self._serialize_children()
-        return f"<{self.tag}{attrs}>{inner}</{self.tag}>"
+        out: list[str] = []
+        self._write(out)
+        return "".join(out)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def serialize(self, prepend_doctype: bool = True) -> str:
-        if prepend_doctype:
-            return "<!DOCTYPE html>" + self._serialize()
-        return self._serialize()
+        out: list[str] = ["<!DOCTYPE html>"] if prepend_doctype else []
+        self._write(out)
+        return "".join(out)
+
+    def frozen(self) -> Self:
+        """Mark this element as immutable and memoise its rendered HTML.
+
+        The first render of a frozen element stores the HTML of its whole
+        subtree, and every later render (including repeated use of the same
+        element in several places) reuses that string.  Use it for fragments
+        such as navigation bars or footers that are shared between pages.
+
+        Appending children via a ``with`` block drops the cached HTML, but
+        changes to descendants are not tracked: do not modify the subtree of a
+        frozen element after it has been rendered.
+        """
+        self._frozen = True
+        return self
+
+    def serialize_bytes(self, prepend_doctype: bool = True) -> bytes:
+        """Serialize this element to UTF-8 encoded bytes."""
+        return self.serialize(prepend_doctype).encode()
 
     def write(self, path: str | Path) -> None:
-        """Serialize this element and write the result to a file at *path*."""
-        Path(path).write_text(self.serialize())
+        """Serialize this element and write the result to a UTF-8 file at *path*."""
+        Path(path).write_bytes(self.serialize_bytes())
+
+
+class _VoidElement(Element):
+    """Base class for void elements such as ``<br />``, which have no children."""
+
+    __slots__ = ()
+    self_closing = True
+
+    def _open(self, out: list[str], stack: list[_Node | str]) -> None:
+        """Emit the self-closing tag; there is nothing to schedule."""
+        out.append(self._start_tag)
+
+
+class _RawTextElement(Element):
+    """Base class for elements whose text content is emitted without escaping."""
+
+    __slots__ = ()
+    raw_text = True
+
+    def _open(self, out: list[str], stack: list[_Node | str]) -> None:
+        """Emit the opening tag and schedule the unescaped contents on *stack*."""
+        if self._frozen:
+            out.append(self._frozen_output())
+            return
+        out.append(self._start_tag)
+        stack.append(self._close_tag)
+        for child in reversed(self.children):
+            if type(child) is str or isinstance(child, (Element, Trusted)):
+                stack.append(child)
+            else:
+                stack.append(str(child))
 
 
 # ======================================================================
@@ -140,73 +339,85 @@ class Element:
 
 
 class Html(Element):
+    __slots__ = ()
     tag = "html"
 
 
 class Head(Element):
+    __slots__ = ()
     tag = "head"
 
 
 class Body(Element):
+    __slots__ = ()
     tag = "body"
 
 
 class Title(Element):
+    __slots__ = ()
     tag = "title"
 
 
-class Meta(Element):
+class Meta(_VoidElement):
+    __slots__ = ()
     tag = "meta"
-    self_closing = True
 
 
-class Link(Element):
+class Link(_VoidElement):
+    __slots__ = ()
     tag = "link"
-    self_closing = True
 
 
-class Script(Element):
+class Script(_RawTextElement):
+    __slots__ = ()
     tag = "script"
-    raw_text = True
 
 
-class Style(Element):
+class Style(_RawTextElement):
+    __slots__ = ()
     tag = "style"
-    raw_text = True
 
 
 # -- Sections / Layout ------------------------------------------------
 
 
 class Div(Element):
+    __slots__ = ()
     tag = "div"
 
 
 class Section(Element):
+    __slots__ = ()
     tag = "section"
 
 
 class Article(Element):
+    __slots__ = ()
     tag = "article"
 
 
 class Nav(Element):
+    __slots__ = ()
     tag = "nav"
 
 
 class Header(Element):
+    __slots__ = ()
     tag = "header"
 
 
 class Footer(Element):
+    __slots__ = ()
     tag = "footer"
 
 
 class Main(Element):
+    __slots__ = ()
     tag = "main"
 
 
 class Aside(Element):
+    __slots__ = ()
     tag = "aside"
 
 
@@ -214,26 +425,32 @@ class Aside(Element):
 
 
 class H1(Element):
+    __slots__ = ()
     tag = "h1"
 
 
 class H2(Element):
+    __slots__ = ()
     tag = "h2"
 
 
 class H3(Element):
+    __slots__ = ()
     tag = "h3"
 
 
 class H4(Element):
+    __slots__ = ()
     tag = "h4"
 
 
 class H5(Element):
+    __slots__ = ()
     tag = "h5"
 
 
 class H6(Element):
+    __slots__ = ()
     tag = "h6"
 
 
@@ -241,55 +458,65 @@ class H6(Element):
 
 
 class Span(Element):
+    __slots__ = ()
     tag = "span"
 
 
 class A(Element):
+    __slots__ = ()
     tag = "a"
 
 
 class Strong(Element):
+    __slots__ = ()
     tag = "strong"
 
 
 class Em(Element):
+    __slots__ = ()
     tag = "em"
 
 
 class B(Element):
+    __slots__ = ()
     tag = "b"
 
 
 class I(Element):  # noqa
+    __slots__ = ()
     tag = "i"
 
 
-class Br(Element):
+class Br(_VoidElement):
+    __slots__ = ()
     tag = "br"
-    self_closing = True
 
 
-class Hr(Element):
+class Hr(_VoidElement):
+    __slots__ = ()
     tag = "hr"
-    self_closing = True
 
 
 # -- Text / preformatted ----------------------------------------------
 
 
 class P(Element):
+    __slots__ = ()
     tag = "p"
 
 
 class Pre(Element):
+    __slots__ = ()
     tag = "pre"
 
 
 class Code(Element):
+    __slots__ = ()
     tag = "code"
 
 
 class Blockquote(Element):
+    __slots__ = ()
     tag = "blockquote"
 
 
@@ -297,14 +524,17 @@ class Blockquote(Element):
 
 
 class Ul(Element):
+    __slots__ = ()
     tag = "ul"
 
 
 class Ol(Element):
+    __slots__ = ()
     tag = "ol"
 
 
 class Li(Element):
+    __slots__ = ()
     tag = "li"
 
 
@@ -312,26 +542,32 @@ class Li(Element):
 
 
 class Table(Element):
+    __slots__ = ()
     tag = "table"
 
 
 class Thead(Element):
+    __slots__ = ()
     tag = "thead"
 
 
 class Tbody(Element):
+    __slots__ = ()
     tag = "tbody"
 
 
 class Tr(Element):
+    __slots__ = ()
     tag = "tr"
 
 
 class Th(Element):
+    __slots__ = ()
     tag = "th"
 
 
 class Td(Element):
+    __slots__ = ()
     tag = "td"
 
 
@@ -339,63 +575,73 @@ class Td(Element):
 
 
 class Form(Element):
+    __slots__ = ()
     tag = "form"
 
 
-class Input(Element):
+class Input(_VoidElement):
+    __slots__ = ()
     tag = "input"
-    self_closing = True
 
 
 class Button(Element):
+    __slots__ = ()
     tag = "button"
 
 
 class Label(Element):
+    __slots__ = ()
     tag = "label"
 
 
 class Select(Element):
+    __slots__ = ()
     tag = "select"
 
 
 class Option(Element):
+    __slots__ = ()
     tag = "option"
 
 
 class Textarea(Element):
+    __slots__ = ()
     tag = "textarea"
 
 
 # -- Media -------------------------------------------------------------
 
 
-class Img(Element):
+class Img(_VoidElement):
+    __slots__ = ()
     tag = "img"
-    self_closing = True
 
 
 class Video(Element):
+    __slots__ = ()
     tag = "video"
 
 
 class Audio(Element):
+    __slots__ = ()
     tag = "audio"
 
 
-class Source(Element):
+class Source(_VoidElement):
+    __slots__ = ()
     tag = "source"
-    self_closing = True
 
 
 # -- Media -------------------------------------------------------------
 
 
 class Summary(Element):
+    __slots__ = ()
     tag = "summary"
 
 
 class Details(Element):
+    __slots__ = ()
     tag = "details"
 
 
@@ -414,14 +660,22 @@ class Trusted:
     instance will raise a ``TypeError``.
     """
 
+    __slots__ = ("children",)
+
     def __init__(self, *children: str) -> None:
         for child in children:
             if not isinstance(child, str):  # pyright: ignore
                 raise TypeError(
                     f"Trusted only accepts str children, got {type(child).__name__}"
                 )
+        # Children are validated here, so the serializer can emit them
+        # without any further type checks
         self.children = children
 
+    def _open(self, out: list[str], stack: list[_Node | str]) -> None:
+        """Append the raw strings to *out* without any HTML escaping."""
+        out.extend(self.children)
+
     def _serialize(self) -> str:
         """Return the concatenated raw strings without any HTML escaping."""
         return "".join(self.children)
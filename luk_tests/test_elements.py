@@ -1,5 +1,12 @@
 """Tests for the html_builder package."""
 
+import asyncio
+import contextvars
+import sys
+import threading
+from pathlib import Path
+
+import luk
 import pytest
 from luk import (
     H1,
@@ -8,6 +15,7 @@ from luk import (
     Br,
     Button,
     Div,
+    Element,
     Head,
     Hr,
     Html,
@@ -18,6 +26,7 @@ from luk import (
     Meta,
     P,
     Script,
+    Section,
     Source,
     Span,
     Style,
@@ -57,6 +66,97 @@ class TestBasicSerialisation:
         result = Div(Div(Div("deep"))).serialize(prepend_doctype=False)
         assert result == "<div><div><div>deep</div></div></div>"
 
+    def test_non_str_text_child_converted(self) -> None:
+        result = Td(30, 1.5).serialize(prepend_doctype=False)  # type: ignore[arg-type]
+        assert result == "<td>301.5</td>"
+
+    def test_str_subclass_child_escaped(self) -> None:
+        class Markup(str):
+            pass
+
+        result = Span(Markup("<i>")).serialize(prepend_doctype=False)
+        assert result == "<span>&lt;i&gt;</span>"
+
+    def test_clean_str_subclass_child_rendered(self) -> None:
+        """A subclass whose ``__str__`` returns itself is still emitted as text."""
+
+        class SafeString(str):
+            def __str__(self) -> str:
+                return self
+
+        assert Div(SafeString("hello")).serialize(prepend_doctype=False) == (
+            "<div>hello</div>"
+        )
+        assert Script(SafeString("x = 1")).serialize(prepend_doctype=False) == (
+            "<script>x = 1</script>"
+        )
+
+    def test_nesting_deeper_than_recursion_limit(self) -> None:
+        depth = sys.getrecursionlimit() + 100
+        tree = Span("leaf")
+        for _ in range(depth):
+            tree = Div(tree)
+        result = tree.serialize(prepend_doctype=False)
+        assert result == "<div>" * depth + "<span>leaf</span>" + "</div>" * depth
+
+    def test_tag_fragments_are_interned(self) -> None:
+        result = Div(Div(), Br()).serialize(prepend_doctype=False)
+        assert result == "<div><div></div><br /></div>"
+        for cls in (Div, Br, Script):
+            for fragment in (cls._open_prefix, cls._open_bare, cls._close_tag):
+                # Interning an equal but distinct string only returns the
+                # class's object if that object was interned first
+                copy = "".join(list(fragment))
+                assert sys.intern(copy) is fragment, (cls.__name__, fragment)
+
+    def test_attribute_names_are_interned(self) -> None:
+        name = Element._normalise_attr_name("data_interned_value")
+        assert name == "data-interned-value"
+        assert sys.intern("".join(list(name))) is name
+
+    def test_start_tag_emitted_as_single_fragment(self) -> None:
+        out: list[str] = []
+        Div(Img(src="a.png"), id="x")._write(out)
+        assert out == ['<div id="x">', '<img src="a.png" />', "</div>"]
+
+    def test_custom_element_subclass(self) -> None:
+        class Widget(Element):
+            tag = "my-widget"
+
+        result = Widget("x", id="w").serialize(prepend_doctype=False)
+        assert result == '<my-widget id="w">x</my-widget>'
+        assert Widget().serialize(prepend_doctype=False) == "<my-widget></my-widget>"
+
+    def test_custom_void_and_raw_text_subclasses(self) -> None:
+        class Wbr(Element):
+            tag = "wbr"
+            self_closing = True
+
+        class Template(Element):
+            tag = "template"
+            raw_text = True
+
+        class PlainScript(Script):
+            tag = "x-script"
+            raw_text = False
+
+        assert Wbr(id="w").serialize(prepend_doctype=False) == '<wbr id="w" />'
+        assert Template("<b>&</b>").serialize(prepend_doctype=False) == (
+            "<template><b>&</b></template>"
+        )
+        template = Template(
+            "<p>",
+            Trusted("<!-- t -->"),
+            1,  # type: ignore[arg-type]
+        ).frozen()
+        for _ in range(2):
+            assert template.serialize(prepend_doctype=False) == (
+                "<template><p><!-- t -->1</template>"
+            )
+        assert PlainScript("a < b").serialize(prepend_doctype=False) == (
+            "<x-script>a &lt; b</x-script>"
+        )
+
 
 # ------------------------------------------------------------------
 # Attributes
@@ -77,6 +177,11 @@ class TestAttributes:
         result = Div(data_value="42").serialize(prepend_doctype=False)
         assert result == '<div data-value="42"></div>'
 
+    def test_attribute_name_normalised_consistently(self) -> None:
+        first = Div(data_user_id="1", for_="x").serialize(prepend_doctype=False)
+        second = Div(data_user_id="1", for_="x").serialize(prepend_doctype=False)
+        assert first == second == '<div data-user-id="1" for="x"></div>'
+
     def test_boolean_true_attribute(self) -> None:
         result = Input(type="text", disabled=True).serialize(prepend_doctype=False)
         assert result == '<input type="text" disabled />'
@@ -89,6 +194,19 @@ class TestAttributes:
         result = Div(id=None).serialize(prepend_doctype=False)
         assert result == "<div></div>"
 
+    def test_shared_element_renders_attributes_each_time(self) -> None:
+        nav = A("home", href="/", class_="nav")
+        page = Div(nav, Div(nav))
+        assert page.serialize(prepend_doctype=False) == (
+            '<div><a href="/" class="nav">home</a>'
+            '<div><a href="/" class="nav">home</a></div></div>'
+        )
+
+    def test_attributes_snapshotted_at_construction(self) -> None:
+        div = Div(id="before")
+        div.attributes["id"] = "after"
+        assert div.serialize(prepend_doctype=False) == '<div id="before"></div>'
+
     def test_multiple_attributes(self) -> None:
         result = A("click", href="/page", class_="link").serialize(
             prepend_doctype=False
@@ -132,6 +250,30 @@ class TestSelfClosing:
         )
         assert result == '<source src="video.mp4" type="video/mp4" />'
 
+    def test_void_elements_keep_self_closing_flag(self) -> None:
+        for cls in (Br, Hr, Img, Input, Meta, Link, Source):
+            assert cls.self_closing
+            assert not cls.raw_text
+
+    def test_raw_text_elements_keep_raw_text_flag(self) -> None:
+        for cls in (Script, Style):
+            assert cls.raw_text
+            assert not cls.self_closing
+
+    def test_raw_text_open_renders_mixed_children(self) -> None:
+        result = Script(
+            "if (a < b) {",
+            Trusted("/* t */"),
+            1,
+            "}",  # type: ignore[arg-type]
+        ).serialize(prepend_doctype=False)
+        assert result == "<script>if (a < b) {/* t */1}</script>"
+
+    def test_frozen_raw_text_element(self) -> None:
+        style = Style("a > b { }").frozen()
+        assert style.serialize(prepend_doctype=False) == "<style>a > b { }</style>"
+        assert style.serialize(prepend_doctype=False) == "<style>a > b { }</style>"
+
     def test_self_closing_rejects_children(self) -> None:
         with pytest.raises(ValueError, match="self-closing"):
             Br("oops")
@@ -152,6 +294,29 @@ class TestEscaping:
         result = Div(title='a "quoted" value').serialize(prepend_doctype=False)
         assert result == '<div title="a &quot;quoted&quot; value"></div>'
 
+    def test_attribute_ampersand_and_apostrophe_escaped(self) -> None:
+        result = A(href="/?a=1&b='2'").serialize(prepend_doctype=False)
+        assert result == '<a href="/?a=1&amp;b=&#x27;2&#x27;"></a>'
+
+    def test_attribute_value_without_unsafe_chars_unchanged(self) -> None:
+        result = Div(title="plain value").serialize(prepend_doctype=False)
+        assert result == '<div title="plain value"></div>'
+
+    def test_text_content_quotes_not_escaped(self) -> None:
+        result = Span("<script>alert('xss')</script>").serialize(prepend_doctype=False)
+        assert result == "<span>&lt;script&gt;alert('xss')&lt;/script&gt;</span>"
+
+    def test_large_text_escaped(self) -> None:
+        text = "plain text " * 1000 + "<b>&'\"</b>"
+        result = P(text).serialize(prepend_doctype=False)
+        assert result == (
+            "<p>" + "plain text " * 1000 + "&lt;b&gt;&amp;'\"&lt;/b&gt;" + "</p>"
+        )
+
+    def test_text_without_unsafe_chars_unchanged(self) -> None:
+        text = "nothing to escape here"
+        assert P(text).serialize(prepend_doctype=False) == f"<p>{text}</p>"
+
     def test_script_content_not_escaped(self) -> None:
         result = Script("console.log('hi');").serialize(prepend_doctype=False)
         assert result == "<script>console.log('hi');</script>"
@@ -227,6 +392,92 @@ class TestComposite:
         assert "<script>console.log('hi');</script>" in result
 
 
+# ------------------------------------------------------------------
+# Frozen (memoised) fragments
+# ------------------------------------------------------------------
+
+
+class TestFrozen:
+    def test_frozen_returns_self(self) -> None:
+        div = Div("x")
+        assert div.frozen() is div
+
+    def test_frozen_renders_like_unfrozen(self) -> None:
+        nav = Ul(Li(A("Home", href="/")), Li("About"), class_="nav").frozen()
+        expected = '<ul class="nav"><li><a href="/">Home</a></li><li>About</li></ul>'
+        assert nav.serialize(prepend_doctype=False) == expected
+        assert nav.serialize(prepend_doctype=False) == expected
+
+    def test_frozen_fragment_shared_between_pages(self) -> None:
+        footer = Div(P("(c) luk"), id="footer").frozen()
+        first = Html(Body(H1("One"), footer)).serialize()
+        second = Html(Body(H1("Two"), footer)).serialize()
+        assert first == (
+            '<!DOCTYPE html><html><body><h1>One</h1><div id="footer">'
+            "<p>(c) luk</p></div></body></html>"
+        )
+        assert second == first.replace("One", "Two")
+
+    def test_frozen_output_is_cached(self) -> None:
+        leaf = Span("cached")
+        frozen = Div(leaf).frozen()
+        assert frozen.serialize(prepend_doctype=False) == (
+            "<div><span>cached</span></div>"
+        )
+        # Descendants are not tracked once rendered (documented contract)
+        leaf.children = ("changed",)
+        assert frozen.serialize(prepend_doctype=False) == (
+            "<div><span>cached</span></div>"
+        )
+
+    def test_with_block_invalidates_cache(self) -> None:
+        frozen = Div(Span("a")).frozen()
+        assert frozen.serialize(prepend_doctype=False) == "<div><span>a</span></div>"
+        with frozen:
+            Span("b")
+        assert frozen.serialize(prepend_doctype=False) == (
+            "<div><span>a</span><span>b</span></div>"
+        )
+
+    def test_nested_frozen_elements(self) -> None:
+        inner = P("inner").frozen()
+        outer = Div(inner, inner, "tail").frozen()
+        expected = "<div><p>inner</p><p>inner</p>tail</div>"
+        assert outer.serialize(prepend_doctype=False) == expected
+        assert Section(outer).serialize(prepend_doctype=False) == (
+            f"<section>{expected}</section>"
+        )
+
+    def test_frozen_void_element(self) -> None:
+        assert Br().frozen().serialize(prepend_doctype=False) == "<br />"
+
+
+# ------------------------------------------------------------------
+# Byte output and files
+# ------------------------------------------------------------------
+
+
+class TestOutput:
+    def test_serialize_bytes_is_utf8(self) -> None:
+        page = P("héllo ✓")
+        assert page.serialize_bytes() == page.serialize().encode("utf-8")
+
+    def test_serialize_bytes_without_doctype(self) -> None:
+        assert Br().serialize_bytes(prepend_doctype=False) == b"<br />"
+
+    def test_write_creates_utf8_file(self, tmp_path: Path) -> None:
+        path = tmp_path / "index.html"
+        Html(Body(P("naïve ✓"))).write(path)
+        assert path.read_bytes() == (
+            "<!DOCTYPE html><html><body><p>naïve ✓</p></body></html>".encode()
+        )
+
+    def test_write_accepts_str_path(self, tmp_path: Path) -> None:
+        path = tmp_path / "page.html"
+        Div("x").write(str(path))
+        assert path.read_text(encoding="utf-8") == "<!DOCTYPE html><div>x</div>"
+
+
 # ------------------------------------------------------------------
 # Trusted (no-escape container)
 # ------------------------------------------------------------------
@@ -256,6 +507,22 @@ class TestTrusted:
         with pytest.raises(TypeError, match="Trusted only accepts str children"):
             Trusted(42)  # type: ignore[arg-type]
 
+    def test_open_emits_raw_strings(self) -> None:
+        out: list[str] = []
+        stack: list[object] = []
+        Trusted("<a>", "<b>")._open(out, stack)  # type: ignore[arg-type]
+        assert out == ["<a>", "<b>"]
+        assert stack == []
+
+    def test_is_not_an_element(self) -> None:
+        assert not isinstance(Trusted("x"), Element)
+
+    def test_sibling_trusted_nodes_keep_order(self) -> None:
+        result = Div(
+            Trusted("<i>1</i>"), "2", Trusted("<i>3</i>", "<i>4</i>")
+        ).serialize(prepend_doctype=False)
+        assert result == "<div><i>1</i>2<i>3</i><i>4</i></div>"
+
     def test_nested_in_element(self) -> None:
         result = Div("safe", Trusted("<hr />"), "also safe").serialize(
             prepend_doctype=False
@@ -263,6 +530,30 @@ class TestTrusted:
         assert result == "<div>safe<hr />also safe</div>"
 
 
+# ------------------------------------------------------------------
+# Memory layout
+# ------------------------------------------------------------------
+
+
+class TestSlots:
+    def test_builtin_elements_have_no_instance_dict(self) -> None:
+        for name in luk.__all__:
+            cls = getattr(luk, name)
+            if isinstance(cls, type) and issubclass(cls, Element):
+                assert not hasattr(cls(), "__dict__"), name
+
+    def test_trusted_has_no_instance_dict(self) -> None:
+        assert not hasattr(Trusted("x"), "__dict__")
+
+    def test_user_subclass_without_slots_still_works(self) -> None:
+        class Widget(Element):
+            tag = "widget"
+
+        widget = Widget("x")
+        widget.extra = 1  # type: ignore[attr-defined]
+        assert widget.serialize(prepend_doctype=False) == "<widget>x</widget>"
+
+
 # ------------------------------------------------------------------
 # Context manager
 # ------------------------------------------------------------------
@@ -373,6 +664,34 @@ class TestContextManager:
             "<div>initial<span>also-initial</span><p>added-via-context</p></div>"
         )
 
+    def test_functional_children_are_not_copied(self) -> None:
+        """Children passed positionally are kept as-is until a with block needs them."""
+        span = Span("x")
+        div = Div("text", span)
+        assert div.children == ("text", span)
+
+        with div:
+            P("added")
+
+        assert isinstance(div.children, list)
+        assert div._serialize() == "<div>text<span>x</span><p>added</p></div>"
+
+    def test_append_after_construction(self) -> None:
+        """append() works on elements whose children are still a tuple."""
+        ul = Ul(Li("one"))
+        ul.append(Li("two"), "three")
+        assert ul._serialize() == "<ul><li>one</li><li>two</li>three</ul>"
+
+    def test_append_invalidates_frozen_cache(self) -> None:
+        div = Div("a").frozen()
+        assert div._serialize() == "<div>a</div>"
+        div.append("b")
+        assert div._serialize() == "<div>ab</div>"
+
+    def test_append_rejects_children_on_self_closing(self) -> None:
+        with pytest.raises(ValueError, match="self-closing"):
+            Br().append("oops")
+
     def test_self_closing_element_rejects_context_manager(self) -> None:
         """Self-closing elements raise ValueError when used as context managers."""
         with pytest.raises(ValueError, match="self-closing"):
@@ -414,6 +733,71 @@ class TestContextManager:
         assert len(outer.children) == 2  # inner div and P
         assert len(inner.children) == 1  # just the span
 
+    def test_context_is_isolated_between_threads(self) -> None:
+        """A `with` block in one thread does not capture elements from another."""
+        barrier = threading.Barrier(2)
+        results: dict[str, Div] = {}
+
+        def build(name: str) -> None:
+            with Div() as container:
+                barrier.wait()
+                Span(name)
+                barrier.wait()
+            results[name] = container
+
+        threads = [threading.Thread(target=build, args=(n,)) for n in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results["a"]._serialize() == "<div><span>a</span></div>"
+        assert results["b"]._serialize() == "<div><span>b</span></div>"
+
+    def test_context_is_isolated_between_asyncio_tasks(self) -> None:
+        """Concurrent tasks each build their own tree, even after earlier blocks."""
+        with Div():
+            pass
+
+        async def build(name: str) -> Div:
+            with Div() as container:
+                await asyncio.sleep(0)
+                Span(name)
+            return container
+
+        async def main() -> list[Div]:
+            return list(await asyncio.gather(build("a"), build("b")))
+
+        first, second = asyncio.run(main())
+        assert first._serialize() == "<div><span>a</span></div>"
+        assert second._serialize() == "<div><span>b</span></div>"
+
+    def test_context_is_isolated_between_copied_contexts(self) -> None:
+        """Threads running in copies of one context do not share parents."""
+        with Div():
+            pass
+        barrier = threading.Barrier(2)
+        results: dict[str, Div] = {}
+
+        def build(name: str) -> None:
+            with Div() as container:
+                barrier.wait()
+                Span(name)
+                barrier.wait()
+            results[name] = container
+
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run, args=(build, n))
+            for n in ("a", "b")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results["a"]._serialize() == "<div><span>a</span></div>"
+        assert results["b"]._serialize() == "<div><span>b</span></div>"
+
     def test_element_created_outside_context_not_appended(self) -> None:
         """Elements created outside any context have no automatic parent."""
         before = Span("before")